@@ -4,25 +4,38 @@
 GPX 파일을 파싱하여 런/리프트 구간을 분리하고 슬로프를 추정합니다.
 """
 
-import xml.etree.ElementTree as ET
 from dataclasses import dataclass
 from typing import List, Tuple
 from datetime import datetime
 import math
+import os
+import sys
 
-@dataclass
-class TrackPoint:
-    lat: float
-    lon: float
-    ele: float  # 고도 (m)
-    time: str
-    speed: float  # m/s
+from bisect import bisect_right
 
-@dataclass
+import numpy as np
+import pandas as pd
+import ruptures as rpt
+from lxml import etree
+
+@dataclass(slots=True)
+class GPXTrack:
+    """트랙포인트 SoA(Struct-of-Arrays) 컨테이너"""
+    lat: np.ndarray    # float64, 위도
+    lon: np.ndarray    # float64, 경도
+    ele: np.ndarray    # float64, 고도 (m)
+    speed: np.ndarray  # float64, 속도 (m/s)
+    times: List[str]   # ISO 타임스탬프
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+@dataclass(slots=True)
 class Segment:
     """런 또는 리프트 구간"""
     segment_type: str  # 'run' or 'lift' or 'rest'
-    points: List[TrackPoint]
+    start: int  # 트랙 인덱스 (시작)
+    end: int    # 트랙 인덱스 (끝, exclusive)
     start_time: str
     end_time: str
     start_ele: float
@@ -41,160 +54,273 @@ class Segment:
 SLOPE_ZONES = {
     # 경도(lon) 범위로 대략 구분 (서쪽 -> 동쪽)
     # 위도(lat) 범위도 고려
-    
+
     # 서쪽 구역 (빅토리아/헤라)
     'VICTORIA': {'lon_range': (128.817, 128.822), 'lat_range': (37.183, 37.200), 'ele_top': 1340, 'difficulty': 'advanced'},
     'HERA': {'lon_range': (128.822, 128.826), 'lat_range': (37.183, 37.200), 'ele_top': 1340, 'difficulty': 'intermediate'},
-    
+
     # 중앙 구역 (제우스/아테나)
     'ZEUS': {'lon_range': (128.826, 128.830), 'lat_range': (37.190, 37.210), 'ele_top': 1340, 'difficulty': 'beginner'},
     'ATHENA': {'lon_range': (128.826, 128.832), 'lat_range': (37.183, 37.200), 'ele_top': 1200, 'difficulty': 'intermediate'},
-    
+
     # 동쪽 구역 (아폴로)
     'APOLLO': {'lon_range': (128.830, 128.835), 'lat_range': (37.183, 37.200), 'ele_top': 1340, 'difficulty': 'advanced'},
 }
 
-def parse_gpx(file_path: str) -> List[TrackPoint]:
-    """GPX 파일을 파싱하여 트랙포인트 리스트 반환"""
-    tree = ET.parse(file_path)
-    root = tree.getroot()
-    
-    # GPX 네임스페이스 처리
-    ns = {'gpx': 'http://www.topografix.com/GPX/1/1', 'gte': 'http://www.gpstrackeditor.com/xmlschemas/General/1'}
-    
-    points = []
-    for trkpt in root.findall('.//gpx:trkpt', ns):
-        lat = float(trkpt.get('lat'))
-        lon = float(trkpt.get('lon'))
-        
-        ele_elem = trkpt.find('gpx:ele', ns)
-        ele = float(ele_elem.text) if ele_elem is not None else 0
-        
-        time_elem = trkpt.find('gpx:time', ns)
-        time = time_elem.text if time_elem is not None else ''
-        
+# 배열 확장 단위 (트랙포인트 수를 미리 알 수 없으므로 청크 단위로 늘림)
+_GROW_CHUNK = 4096
+
+# GPX 네임스페이스 (lxml은 qualified name으로 C 레벨에서 바로 탐색)
+_GPX_NS = 'http://www.topografix.com/GPX/1/1'
+_GTE_NS = 'http://www.gpstrackeditor.com/xmlschemas/General/1'
+_TRKPT_TAG = f'{{{_GPX_NS}}}trkpt'
+_ELE_TAG = f'{{{_GPX_NS}}}ele'
+_TIME_TAG = f'{{{_GPX_NS}}}time'
+_EXT_TAG = f'{{{_GPX_NS}}}extensions'
+_GPS_TAG = f'{{{_GTE_NS}}}gps'
+
+def parse_gpx(file_path: str) -> GPXTrack:
+    """GPX 파일을 스트리밍 파싱하여 SoA 트랙 반환"""
+
+    cap = _GROW_CHUNK
+    lat = np.empty(cap, dtype=np.float64)
+    lon = np.empty(cap, dtype=np.float64)
+    ele = np.empty(cap, dtype=np.float64)
+    speed = np.empty(cap, dtype=np.float64)
+    times = []
+    n = 0
+
+    # 루프 내부에서 반복 조회되는 이름들을 로컬로 바인딩 (핫 루프 미세 최적화)
+    times_append = times.append
+    ele_tag, time_tag, ext_tag, gps_tag = _ELE_TAG, _TIME_TAG, _EXT_TAG, _GPS_TAG
+
+    # lxml iterparse: tag 필터링이 C 레벨에서 수행되어 trkpt 외 요소는 파이썬까지 올라오지 않음
+    # huge_tree: 내부 버퍼 제한 해제 (수 MB GPX), collect_ids/resolve_entities 비활성화로
+    # 파서 오버헤드와 외부 엔티티 처리를 함께 차단
+    for event, elem in etree.iterparse(file_path, events=('end',), tag=_TRKPT_TAG,
+                                       huge_tree=True, collect_ids=False,
+                                       resolve_entities=False, no_network=True):
+        if n == cap:
+            cap += _GROW_CHUNK
+            lat = np.resize(lat, cap)
+            lon = np.resize(lon, cap)
+            ele = np.resize(ele, cap)
+            speed = np.resize(speed, cap)
+
+        lat[n] = float(elem.get('lat'))
+        lon[n] = float(elem.get('lon'))
+
+        ele_elem = elem.find(ele_tag)
+        ele[n] = float(ele_elem.text) if ele_elem is not None else 0
+
+        time_elem = elem.find(time_tag)
+        times_append(time_elem.text if time_elem is not None else '')
+
         # 속도 추출
-        speed = 0.0
-        extensions = trkpt.find('gpx:extensions', ns)
+        spd = 0.0
+        extensions = elem.find(ext_tag)
         if extensions is not None:
-            gps = extensions.find('gte:gps', ns)
+            gps = extensions.find(gps_tag)
             if gps is not None:
-                speed = float(gps.get('speed', 0))
-        
-        points.append(TrackPoint(lat=lat, lon=lon, ele=ele, time=time, speed=speed))
-    
-    return points
+                spd = float(gps.get('speed', 0))
+        speed[n] = spd
+
+        n += 1
+        # 처리한 trkpt와 앞선 형제 노드는 바로 해제 (피크 메모리 절감)
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
 
-def calculate_distance(p1: TrackPoint, p2: TrackPoint) -> float:
+    return GPXTrack(lat=lat[:n], lon=lon[:n], ele=ele[:n], speed=speed[:n], times=times)
+
+def load_points(file_path: str) -> GPXTrack:
+    """GPX 로더 - 파싱 결과를 .npz로 캐시하여 재실행 시 XML 파싱 생략"""
+    cache_path = file_path + '.npz'
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(file_path):
+        data = np.load(cache_path)
+        return GPXTrack(lat=data['lat'], lon=data['lon'], ele=data['ele'],
+                        speed=data['speed'], times=data['times'].tolist())
+
+    track = parse_gpx(file_path)
+    np.savez(cache_path, lat=track.lat, lon=track.lon, ele=track.ele,
+             speed=track.speed, times=np.array(track.times))
+    return track
+
+def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """두 점 사이의 거리 계산 (미터)"""
     R = 6371000  # 지구 반경 (m)
-    lat1, lat2 = math.radians(p1.lat), math.radians(p2.lat)
-    dlat = math.radians(p2.lat - p1.lat)
-    dlon = math.radians(p2.lon - p1.lon)
-    
-    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
+    lat1_r, lat2_r = math.radians(lat1), math.radians(lat2)
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+
+    a = math.sin(dlat/2)**2 + math.cos(lat1_r) * math.cos(lat2_r) * math.sin(dlon/2)**2
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
     return R * c
 
+def haversine_array(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """인접 포인트 간 거리를 한 번에 계산 (미터, 길이 n-1 배열)"""
+    R = 6371000  # 지구 반경 (m)
+    lat_r = np.radians(lat)
+    dlat = np.diff(lat_r)
+    dlon = np.diff(np.radians(lon))
+
+    a = np.sin(dlat/2)**2 + np.cos(lat_r[:-1]) * np.cos(lat_r[1:]) * np.sin(dlon/2)**2
+    return R * 2 * np.arcsin(np.sqrt(a))
+
+def equirect_array(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """인접 포인트 간 등장방형(cheap-ruler) 근사 거리 (미터, 길이 n-1 배열)
+
+    트랙이 리조트 크기(~2km)의 작은 박스에 갇혀 있어 구면 보정이 사실상
+    상수이므로, cos(기준위도)를 한 번만 계산하고 피타고라스로 근사한다.
+    이 스케일에서 하버사인과의 오차는 1cm 미만.
+    """
+    R = 6371000  # 지구 반경 (m)
+    lat0 = math.radians(float(lat.mean()))
+    kx = R * math.cos(lat0) * math.pi / 180  # 경도 1도당 미터
+    ky = R * math.pi / 180                   # 위도 1도당 미터
+    return np.hypot(np.diff(lon) * kx, np.diff(lat) * ky)
+
+def step_distances(track: GPXTrack) -> np.ndarray:
+    """트랙 전체의 인접 포인트 거리를 한 번만 계산 (미터, 길이 n-1)
+
+    도→미터 환산과 diff를 트랙당 한 번만 수행한다. 세그먼트 거리는
+    이 배열의 슬라이스 합이므로 세그먼트마다 환산을 반복하지 않는다.
+    """
+    return equirect_array(track.lat, track.lon)
+
+# 구역 범위를 lon 시작값 기준 정렬된 평행 배열로 펼침 (import 시 1회)
+# stable 정렬이므로 시작값이 같은 구역(제우스/아테나)은 정의 순서를 유지 -> 우선순위 보존
+_zone_order = sorted(range(len(SLOPE_ZONES)),
+                     key=lambda i: list(SLOPE_ZONES.values())[i]['lon_range'][0])
+_ZONE_NAMES = [list(SLOPE_ZONES.keys())[i] for i in _zone_order]
+_zones = [list(SLOPE_ZONES.values())[i] for i in _zone_order]
+_LON_LO = [z['lon_range'][0] for z in _zones]
+_LON_LO_ARR = np.array(_LON_LO)
+_LON_HI = np.array([z['lon_range'][1] for z in _zones])
+_LAT_LO = np.array([z['lat_range'][0] for z in _zones])
+_LAT_HI = np.array([z['lat_range'][1] for z in _zones])
+
 def estimate_slope_zone(lat: float, lon: float, ele: float) -> str:
     """좌표를 기반으로 슬로프 구역 추정"""
-    for zone_name, zone in SLOPE_ZONES.items():
-        if (zone['lon_range'][0] <= lon <= zone['lon_range'][1] and
-            zone['lat_range'][0] <= lat <= zone['lat_range'][1]):
-            return zone_name
+    # lon 시작값이 lon보다 큰 구역은 후보가 아님 -> bisect로 스캔 상한 결정
+    hi = bisect_right(_LON_LO, lon)
+    for i in range(hi):
+        if lon <= _LON_HI[i] and _LAT_LO[i] <= lat <= _LAT_HI[i]:
+            return _ZONE_NAMES[i]
     return 'UNKNOWN'
 
-def segment_runs(points: List[TrackPoint]) -> List[Segment]:
-    """트랙포인트를 런/리프트/휴식 구간으로 분리"""
-    segments = []
-    current_points = []
-    current_type = None
-    
-    SPEED_THRESHOLD_RUN = 5.0  # km/h - 이 이상이면 런
-    SPEED_THRESHOLD_LIFT = 2.0  # km/h - 이 이하면 휴식, 사이면 리프트
-    MIN_SEGMENT_POINTS = 10  # 최소 포인트 수
-    
-    for i, point in enumerate(points):
-        speed_kmh = point.speed * 3.6
-        
-        # 상태 결정
-        if speed_kmh > SPEED_THRESHOLD_RUN:
-            # 고도 변화 방향 체크 (이전 5포인트 평균)
-            if i > 5:
-                recent_ele_change = point.ele - points[i-5].ele
-                if recent_ele_change < -3:  # 하강 중
-                    new_type = 'run'
-                elif recent_ele_change > 3:  # 상승 중 (빠른 속도)
-                    new_type = 'lift'  # 곤돌라?
-                else:
-                    new_type = 'run'
-            else:
-                new_type = 'run'
-        elif speed_kmh > SPEED_THRESHOLD_LIFT:
-            # 저속 이동 - 리프트 또는 천천히 이동
-            if i > 5:
-                recent_ele_change = point.ele - points[i-5].ele
-                if recent_ele_change > 2:  # 상승 중
-                    new_type = 'lift'
-                else:
-                    new_type = 'rest'
-            else:
-                new_type = 'lift'
-        else:
-            new_type = 'rest'
-        
-        # 상태 변경 감지
-        if current_type is None:
-            current_type = new_type
-        
-        if new_type != current_type and len(current_points) >= MIN_SEGMENT_POINTS:
-            # 새 세그먼트 시작
-            seg = create_segment(current_points, current_type)
-            if seg:
-                segments.append(seg)
-            current_points = [point]
-            current_type = new_type
+def estimate_slope_zones(lats: np.ndarray, lons: np.ndarray) -> List[str]:
+    """여러 좌표의 슬로프 구역을 한 번에 추정 (브랜치 없는 브로드캐스트 버전)
+
+    (N, K) 포함 마스크를 한 번의 벡터 연산으로 만들고 argmax로 첫 매칭
+    구역을 고른다. 구역 배열이 우선순위 순으로 정렬되어 있으므로
+    argmax(첫 True)가 스칼라 버전과 같은 구역을 돌려준다.
+    """
+    lats = np.asarray(lats)[:, None]
+    lons = np.asarray(lons)[:, None]
+    hits = ((lons >= _LON_LO_ARR) & (lons <= _LON_HI) &
+            (lats >= _LAT_LO) & (lats <= _LAT_HI))
+    idx = np.where(hits.any(axis=1), hits.argmax(axis=1), -1)
+    return ['UNKNOWN' if i < 0 else _ZONE_NAMES[i] for i in idx]
+
+# 변화점 탐지 파라미터
+_CPD_WIDTH = 30  # 슬라이딩 윈도우 폭 (포인트 수)
+_CPD_PENALTY = 100  # 변화점 추가 비용 (l2 비용 기준)
+
+SPEED_THRESHOLD_RUN = 5.0  # km/h - 이 이상이면 런
+SPEED_THRESHOLD_LIFT = 2.0  # km/h - 이 이하면 휴식, 사이면 리프트
+
+def _classify_slice(speed_kmh: np.ndarray, ele: np.ndarray, start: int, end: int) -> str:
+    """변화점 사이 구간을 평균 속도 / 순 고도 변화로 분류"""
+    mean_speed = float(speed_kmh[start:end].mean())
+    ele_change = float(ele[end-1] - ele[start])
+
+    if mean_speed > SPEED_THRESHOLD_RUN:
+        # 고속인데 상승 중이면 곤돌라
+        return 'lift' if ele_change > 3 else 'run'
+    elif mean_speed > SPEED_THRESHOLD_LIFT:
+        return 'lift' if ele_change > 2 else 'rest'
+    return 'rest'
+
+def segment_runs(track: GPXTrack) -> List[Segment]:
+    """트랙포인트를 런/리프트/휴식 구간으로 분리
+
+    포인트별 임계값 상태머신 대신 (속도, 고도 변화율) 2차원 신호에 대한
+    슬라이딩 윈도우 변화점 탐지(ruptures Window)로 경계를 찾고, 경계 사이
+    구간을 통째로 분류한다. MIN_SEGMENT_POINTS 휴리스틱이 필요 없어짐.
+    """
+    n = len(track)
+    if n == 0:
+        return []
+
+    speed_kmh = track.speed * 3.6
+
+    # 변화점 탐지: 속도 + 고도 변화율 신호
+    if n > 2 * _CPD_WIDTH:
+        signal = np.column_stack([speed_kmh, np.gradient(track.ele)])
+        bkps = rpt.Window(width=_CPD_WIDTH, model='l2').fit(signal).predict(pen=_CPD_PENALTY)
+    else:
+        bkps = [n]  # 너무 짧으면 단일 구간
+
+    # 경계 사이 구간 분류 후, 같은 타입이 이어지면 병합
+    bounds = [0] + list(bkps)
+    starts, ends, type_names = [], [], []
+    for s, e in zip(bounds[:-1], bounds[1:]):
+        seg_type = _classify_slice(speed_kmh, track.ele, s, e)
+        if type_names and type_names[-1] == seg_type:
+            ends[-1] = e
         else:
-            current_points.append(point)
-    
-    # 마지막 세그먼트
-    if len(current_points) >= MIN_SEGMENT_POINTS:
-        seg = create_segment(current_points, current_type)
+            starts.append(s)
+            ends.append(e)
+            type_names.append(seg_type)
+
+    starts = np.array(starts, dtype=np.int64)
+    ends = np.array(ends, dtype=np.int64)
+
+    # 런 세그먼트의 중간 지점 구역을 한 번의 브로드캐스트 연산으로 분류
+    slope_names = ['N/A'] * len(starts)
+    run_mask = np.array([t == 'run' for t in type_names])
+    if run_mask.any():
+        mids = starts[run_mask] + (ends[run_mask] - starts[run_mask]) // 2
+        run_names = estimate_slope_zones(track.lat[mids], track.lon[mids])
+        for i, name in zip(np.flatnonzero(run_mask), run_names):
+            slope_names[i] = name
+
+    # 인접 포인트 거리는 트랙당 한 번만 계산
+    steps = step_distances(track)
+
+    segments = []
+    for start, end, seg_type, slope_name in zip(starts, ends, type_names, slope_names):
+        seg = create_segment(track, steps, int(start), int(end), seg_type, slope_name)
         if seg:
             segments.append(seg)
-    
+
     return segments
 
-def create_segment(points: List[TrackPoint], seg_type: str) -> Segment:
-    """세그먼트 생성"""
-    if not points:
+def create_segment(track: GPXTrack, steps: np.ndarray, start: int, end: int, seg_type: str,
+                   estimated_slope: str = 'N/A') -> Segment:
+    """세그먼트 생성 (슬로프 추정/스텝 거리는 segment_runs에서 일괄 계산)"""
+    if start >= end:
         return None
-    
-    # 총 거리 계산
-    total_distance = 0
-    for i in range(1, len(points)):
-        total_distance += calculate_distance(points[i-1], points[i])
-    
+
+    # 총 거리 = 선계산된 스텝 거리 배열의 슬라이스 합
+    total_distance = float(steps[start:end-1].sum())
+
     # 속도 계산
-    speeds_kmh = [p.speed * 3.6 for p in points if p.speed > 0]
-    max_speed = max(speeds_kmh) if speeds_kmh else 0
-    avg_speed = sum(speeds_kmh) / len(speeds_kmh) if speeds_kmh else 0
-    
-    # 슬로프 추정 (런 구간만)
-    estimated_slope = 'N/A'
-    if seg_type == 'run':
-        # 중간 지점 기준으로 슬로프 추정
-        mid_point = points[len(points) // 2]
-        estimated_slope = estimate_slope_zone(mid_point.lat, mid_point.lon, mid_point.ele)
-    
+    speeds = track.speed[start:end]
+    speeds_kmh = speeds[speeds > 0] * 3.6
+    max_speed = float(speeds_kmh.max()) if len(speeds_kmh) else 0
+    avg_speed = float(speeds_kmh.mean()) if len(speeds_kmh) else 0
+
     return Segment(
         segment_type=seg_type,
-        points=points,
-        start_time=points[0].time,
-        end_time=points[-1].time,
-        start_ele=points[0].ele,
-        end_ele=points[-1].ele,
-        vertical_change=points[-1].ele - points[0].ele,
+        start=start,
+        end=end,
+        start_time=track.times[start],
+        end_time=track.times[end-1],
+        start_ele=track.ele[start],
+        end_ele=track.ele[end-1],
+        vertical_change=track.ele[end-1] - track.ele[start],
         distance=total_distance,
         max_speed=max_speed,
         avg_speed=avg_speed,
@@ -203,75 +329,80 @@ def create_segment(points: List[TrackPoint], seg_type: str) -> Segment:
 
 def analyze_gpx(file_path: str):
     """GPX 파일 분석 및 결과 출력"""
-    print(f"\n{'='*60}")
-    print(f"🎿 하이원 GPX 분석 결과")
-    print(f"{'='*60}\n")
-    
-    # 파싱
-    points = parse_gpx(file_path)
-    print(f"📍 총 트랙포인트: {len(points)}개")
-    
+    # print를 줄마다 호출하는 대신 버퍼에 모았다가 한 번에 출력
+    out = []
+    out.append(f"\n{'='*60}")
+    out.append(f"🎿 하이원 GPX 분석 결과")
+    out.append(f"{'='*60}\n")
+
+    # 파싱 (캐시가 있으면 .npz 로드)
+    track = load_points(file_path)
+    out.append(f"📍 총 트랙포인트: {len(track)}개")
+
     # 기본 통계
-    if points:
-        min_lat = min(p.lat for p in points)
-        max_lat = max(p.lat for p in points)
-        min_lon = min(p.lon for p in points)
-        max_lon = max(p.lon for p in points)
-        min_ele = min(p.ele for p in points)
-        max_ele = max(p.ele for p in points)
-        
-        print(f"📊 좌표 범위:")
-        print(f"   위도: {min_lat:.4f} ~ {max_lat:.4f}")
-        print(f"   경도: {min_lon:.4f} ~ {max_lon:.4f}")
-        print(f"   고도: {min_ele:.0f}m ~ {max_ele:.0f}m (차이: {max_ele-min_ele:.0f}m)")
-        print(f"   시간: {points[0].time} ~ {points[-1].time}")
-    
+    if len(track):
+        # 파이썬 제너레이터 패스 대신 NumPy C 리덕션 (배열당 한 번의 스캔)
+        min_lat, max_lat = track.lat.min(), track.lat.max()
+        min_lon, max_lon = track.lon.min(), track.lon.max()
+        min_ele, max_ele = track.ele.min(), track.ele.max()
+
+        out.append(f"📊 좌표 범위:")
+        out.append(f"   위도: {min_lat:.4f} ~ {max_lat:.4f}")
+        out.append(f"   경도: {min_lon:.4f} ~ {max_lon:.4f}")
+        out.append(f"   고도: {min_ele:.0f}m ~ {max_ele:.0f}m (차이: {max_ele-min_ele:.0f}m)")
+        out.append(f"   시간: {track.times[0]} ~ {track.times[-1]}")
+
     # 세그먼트 분리
-    segments = segment_runs(points)
-    
+    segments = segment_runs(track)
+
     # 런만 필터링
     runs = [s for s in segments if s.segment_type == 'run']
     lifts = [s for s in segments if s.segment_type == 'lift']
-    
-    print(f"\n{'='*60}")
-    print(f"🏔️ 감지된 런: {len(runs)}개")
-    print(f"🚡 감지된 리프트: {len(lifts)}개")
-    print(f"{'='*60}\n")
-    
+
+    out.append(f"\n{'='*60}")
+    out.append(f"🏔️ 감지된 런: {len(runs)}개")
+    out.append(f"🚡 감지된 리프트: {len(lifts)}개")
+    out.append(f"{'='*60}\n")
+
     # 각 런 상세 정보
     for i, run in enumerate(runs, 1):
-        print(f"[Run {i}] {run.estimated_slope}")
-        print(f"   ⏰ 시간: {run.start_time[11:19]} → {run.end_time[11:19]}")
-        print(f"   📍 고도: {run.start_ele:.0f}m → {run.end_ele:.0f}m (↓{abs(run.vertical_change):.0f}m)")
-        print(f"   📏 거리: {run.distance:.0f}m")
-        print(f"   🏃 속도: 최고 {run.max_speed:.1f}km/h, 평균 {run.avg_speed:.1f}km/h")
-        print()
-    
+        out.append(f"[Run {i}] {run.estimated_slope}")
+        out.append(f"   ⏰ 시간: {run.start_time[11:19]} → {run.end_time[11:19]}")
+        out.append(f"   📍 고도: {run.start_ele:.0f}m → {run.end_ele:.0f}m (↓{abs(run.vertical_change):.0f}m)")
+        out.append(f"   📏 거리: {run.distance:.0f}m")
+        out.append(f"   🏃 속도: 최고 {run.max_speed:.1f}km/h, 평균 {run.avg_speed:.1f}km/h")
+        out.append("")
+
     # 슬로프별 통계
-    print(f"\n{'='*60}")
-    print(f"📊 슬로프별 런 수")
-    print(f"{'='*60}")
-    
-    slope_counts = {}
-    for run in runs:
-        slope = run.estimated_slope
-        if slope not in slope_counts:
-            slope_counts[slope] = []
-        slope_counts[slope].append(run)
-    
-    for slope, slope_runs in sorted(slope_counts.items()):
-        total_vertical = sum(abs(r.vertical_change) for r in slope_runs)
-        total_distance = sum(r.distance for r in slope_runs)
-        max_speed = max(r.max_speed for r in slope_runs)
-        print(f"   {slope}: {len(slope_runs)}런, 총 {total_vertical:.0f}m 하강, 거리 {total_distance:.0f}m, 최고속도 {max_speed:.1f}km/h")
-    
+    out.append(f"\n{'='*60}")
+    out.append(f"📊 슬로프별 런 수")
+    out.append(f"{'='*60}")
+
+    if runs:
+        # 수작업 dict 그룹핑 대신 pandas groupby 리덕션 (groupby는 슬로프명 기준 정렬)
+        df = pd.DataFrame({
+            'slope': [r.estimated_slope for r in runs],
+            'vertical': [abs(r.vertical_change) for r in runs],
+            'distance': [r.distance for r in runs],
+            'max_speed': [r.max_speed for r in runs],
+        })
+        stats = df.groupby('slope').agg(
+            run_count=('slope', 'size'),
+            total_vertical=('vertical', 'sum'),
+            total_distance=('distance', 'sum'),
+            max_speed=('max_speed', 'max'),
+        )
+        for slope, row in stats.iterrows():
+            out.append(f"   {slope}: {int(row['run_count'])}런, 총 {row['total_vertical']:.0f}m 하강, 거리 {row['total_distance']:.0f}m, 최고속도 {row['max_speed']:.1f}km/h")
+
+    sys.stdout.write('\n'.join(out) + '\n')
+
     return runs, lifts
 
 if __name__ == '__main__':
-    import sys
     if len(sys.argv) > 1:
         file_path = sys.argv[1]
     else:
         file_path = '/Users/gimdoyun/Documents/snow_recorder/2026년 1월 22일 - High 1.gpx'
-    
+
     analyze_gpx(file_path)
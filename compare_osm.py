@@ -1,20 +1,11 @@
-import requests
-import json
+from osm_cache import get_slopes
 
-overpass_url = "http://overpass-api.de/api/interpreter"
-overpass_query = """
-[out:json];
-way["name:en"="Zeus3"](37.17, 128.80, 37.21, 128.85);
-out body;
->;
-out skel qt;
-"""
-
-response = requests.get(overpass_url, params={'data': overpass_query})
-data = response.json()
+# 공유 캐시에서 piste:type=downhill 슈퍼셋을 받아 메모리에서 Zeus3만 필터링
+data = get_slopes()
 
 nodes = {node['id']: (node['lat'], node['lon']) for node in data['elements'] if node['type'] == 'node'}
-ways = [way for way in data['elements'] if way['type'] == 'way']
+ways = [way for way in data['elements'] if way['type'] == 'way'
+        and way.get('tags', {}).get('name:en') == 'Zeus3']
 
 if not ways:
     print("No way found")
@@ -8,127 +8,199 @@ GPX에서 슬로프별 경계 좌표 추출
 - ZEUS III: 연결 슬로프
 """
 
-import xml.etree.ElementTree as ET
 from collections import defaultdict
+from dataclasses import dataclass
+from typing import List, Tuple
 import json
+import os
+import sys
 
-def parse_gpx(file_path: str):
-    """GPX 파일 파싱"""
-    tree = ET.parse(file_path)
-    root = tree.getroot()
-    ns = {'gpx': 'http://www.topografix.com/GPX/1/1', 'gte': 'http://www.gpstrackeditor.com/xmlschemas/General/1'}
-    
-    points = []
-    for trkpt in root.findall('.//gpx:trkpt', ns):
-        lat = float(trkpt.get('lat'))
-        lon = float(trkpt.get('lon'))
-        ele_elem = trkpt.find('gpx:ele', ns)
-        ele = float(ele_elem.text) if ele_elem is not None else 0
-        time_elem = trkpt.find('gpx:time', ns)
-        time = time_elem.text if time_elem is not None else ''
-        
-        speed = 0.0
-        extensions = trkpt.find('gpx:extensions', ns)
+import numpy as np
+from lxml import etree
+from numba import njit
+
+@dataclass(slots=True)
+class GPXTrack:
+    """트랙포인트 SoA(Struct-of-Arrays) 컨테이너"""
+    lat: np.ndarray    # float64, 위도
+    lon: np.ndarray    # float64, 경도
+    ele: np.ndarray    # float64, 고도 (m)
+    speed: np.ndarray  # float64, 속도 (m/s)
+    times: List[str]   # ISO 타임스탬프
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+# 배열 확장 단위 (트랙포인트 수를 미리 알 수 없으므로 청크 단위로 늘림)
+_GROW_CHUNK = 4096
+
+# GPX 네임스페이스 (lxml은 qualified name으로 C 레벨에서 바로 탐색)
+_GPX_NS = 'http://www.topografix.com/GPX/1/1'
+_GTE_NS = 'http://www.gpstrackeditor.com/xmlschemas/General/1'
+_TRKPT_TAG = f'{{{_GPX_NS}}}trkpt'
+_ELE_TAG = f'{{{_GPX_NS}}}ele'
+_TIME_TAG = f'{{{_GPX_NS}}}time'
+_EXT_TAG = f'{{{_GPX_NS}}}extensions'
+_GPS_TAG = f'{{{_GTE_NS}}}gps'
+
+def parse_gpx(file_path: str) -> GPXTrack:
+    """GPX 파일을 스트리밍 파싱하여 SoA 트랙 반환"""
+
+    cap = _GROW_CHUNK
+    lat = np.empty(cap, dtype=np.float64)
+    lon = np.empty(cap, dtype=np.float64)
+    ele = np.empty(cap, dtype=np.float64)
+    speed = np.empty(cap, dtype=np.float64)
+    times = []
+    n = 0
+
+    # 루프 내부에서 반복 조회되는 이름들을 로컬로 바인딩 (핫 루프 미세 최적화)
+    times_append = times.append
+    ele_tag, time_tag, ext_tag, gps_tag = _ELE_TAG, _TIME_TAG, _EXT_TAG, _GPS_TAG
+
+    # lxml iterparse: tag 필터링이 C 레벨에서 수행되어 trkpt 외 요소는 파이썬까지 올라오지 않음
+    # huge_tree: 내부 버퍼 제한 해제 (수 MB GPX), collect_ids/resolve_entities 비활성화로
+    # 파서 오버헤드와 외부 엔티티 처리를 함께 차단
+    for event, elem in etree.iterparse(file_path, events=('end',), tag=_TRKPT_TAG,
+                                       huge_tree=True, collect_ids=False,
+                                       resolve_entities=False, no_network=True):
+        if n == cap:
+            cap += _GROW_CHUNK
+            lat = np.resize(lat, cap)
+            lon = np.resize(lon, cap)
+            ele = np.resize(ele, cap)
+            speed = np.resize(speed, cap)
+
+        lat[n] = float(elem.get('lat'))
+        lon[n] = float(elem.get('lon'))
+
+        ele_elem = elem.find(ele_tag)
+        ele[n] = float(ele_elem.text) if ele_elem is not None else 0
+
+        time_elem = elem.find(time_tag)
+        times_append(time_elem.text if time_elem is not None else '')
+
+        spd = 0.0
+        extensions = elem.find(ext_tag)
         if extensions is not None:
-            gps = extensions.find('gte:gps', ns)
+            gps = extensions.find(gps_tag)
             if gps is not None:
-                speed = float(gps.get('speed', 0))
-        
-        points.append({'lat': lat, 'lon': lon, 'ele': ele, 'time': time, 'speed': speed})
-    
-    return points
-
-def identify_runs(points):
-    """런 구간 식별 (하강 + 고속)"""
-    runs = []
-    current_run = []
+                spd = float(gps.get('speed', 0))
+        speed[n] = spd
+
+        n += 1
+        # 처리한 trkpt와 앞선 형제 노드는 바로 해제 (피크 메모리 절감)
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+
+    return GPXTrack(lat=lat[:n], lon=lon[:n], ele=ele[:n], speed=speed[:n], times=times)
+
+def load_points(file_path: str) -> GPXTrack:
+    """GPX 로더 - 파싱 결과를 .npz로 캐시하여 재실행 시 XML 파싱 생략"""
+    cache_path = file_path + '.npz'
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(file_path):
+        data = np.load(cache_path)
+        return GPXTrack(lat=data['lat'], lon=data['lon'], ele=data['ele'],
+                        speed=data['speed'], times=data['times'].tolist())
+
+    track = parse_gpx(file_path)
+    np.savez(cache_path, lat=track.lat, lon=track.lon, ele=track.ele,
+             speed=track.speed, times=np.array(track.times))
+    return track
+
+@njit(cache=True)
+def _run_bounds(speed_kmh, n):
+    """런 경계 계산 커널 - (starts, ends) 배열 반환 (speed_kmh는 선계산된 km/h 배열)"""
+    starts = np.empty(n, dtype=np.int64)
+    ends = np.empty(n, dtype=np.int64)
+    count = 0
+    run_start = 0
     in_run = False
-    
-    for i, p in enumerate(points):
-        speed_kmh = p['speed'] * 3.6
-        
+
+    for i in range(n):
         # 런 시작 조건: 속도 > 10km/h
-        if speed_kmh > 10:
+        if speed_kmh[i] > 10:
             if not in_run:
                 in_run = True
-                current_run = [p]
-            else:
-                current_run.append(p)
+                run_start = i
         else:
             # 런 종료
-            if in_run and len(current_run) > 20:  # 최소 20포인트
-                runs.append(current_run)
+            if in_run and i - run_start > 20:  # 최소 20포인트
+                starts[count] = run_start
+                ends[count] = i
+                count += 1
             in_run = False
-            current_run = []
-    
-    return runs
 
-def classify_runs_by_elevation(runs):
+    return starts[:count], ends[:count]
+
+def identify_runs(track: GPXTrack) -> List[Tuple[int, int]]:
+    """런 구간 식별 (하강 + 고속) - (start, end) 인덱스 쌍 반환"""
+    starts, ends = _run_bounds(track.speed * 3.6, len(track))
+    return list(zip(starts.tolist(), ends.tolist()))
+
+# 슬로프 라벨 코드 (int8 라벨 배열의 인덱스)
+_SLOPE_NAMES = ('HERA_II', 'APOLLO_VI', 'ATHENA_II', 'ZEUS_III')
+
+def classify_runs_by_elevation(track: GPXTrack, runs: List[Tuple[int, int]]):
     """
-    고도와 좌표 패턴으로 슬로프 분류
+    고도와 좌표 패턴으로 슬로프 분류 (런별 int8 라벨 배열을 벡터 연산으로 계산)
     사용자 피드백 기반:
     - 헤라2: 정상(~1340m)에서 시작, 경도 128.822~128.826
     - 아폴로6: 정상(~1340m)에서 시작, 경도 < 128.822 (서쪽)
     - 아테나2: 중간 고도(~1100m)에서 시작
     - 제우스3: 하단(~1000m 이하)
     """
-    classified = {
-        'HERA_II': [],
-        'APOLLO_VI': [],
-        'ATHENA_II': [],
-        'ZEUS_III': []
-    }
-    
-    for run in runs:
-        start_ele = run[0]['ele']
-        end_ele = run[-1]['ele']
-        mid_point = run[len(run)//2]
-        avg_lon = sum(p['lon'] for p in run) / len(run)
-        
-        vertical = start_ele - end_ele
-        
-        # 분류 로직
-        if start_ele > 1300:
-            # 정상에서 시작하는 런
-            if avg_lon < 128.822:
-                # 서쪽 = 아폴로6 (기존에 빅토리아로 잘못 감지)
-                classified['APOLLO_VI'].append(run)
-            else:
-                # 동쪽 = 헤라2
-                classified['HERA_II'].append(run)
-        elif start_ele > 1000 and end_ele < 1000:
-            # 중간에서 하단까지 = 아테나2
-            classified['ATHENA_II'].append(run)
-        elif end_ele < 900:
-            # 하단 연결 = 제우스3
-            classified['ZEUS_III'].append(run)
-        else:
-            # 기타는 아테나로
-            classified['ATHENA_II'].append(run)
-    
+    classified = {name: [] for name in _SLOPE_NAMES}
+    if not runs:
+        return classified
+
+    starts = np.array([s for s, _ in runs], dtype=np.int64)
+    ends = np.array([e for _, e in runs], dtype=np.int64)
+
+    # 런별 시작/종료 고도와 평균 경도를 배열 연산으로 한 번에
+    start_ele = track.ele[starts]
+    end_ele = track.ele[ends - 1]
+    lon_cumsum = np.concatenate(([0.0], np.cumsum(track.lon)))
+    avg_lon = (lon_cumsum[ends] - lon_cumsum[starts]) / (ends - starts)
+
+    # 분류 로직 (조건 순서가 우선순위 - np.select는 첫 매치를 택함)
+    labels = np.select(
+        [
+            (start_ele > 1300) & (avg_lon < 128.822),   # 서쪽 정상 = 아폴로6
+            start_ele > 1300,                            # 동쪽 정상 = 헤라2
+            (start_ele > 1000) & (end_ele < 1000),       # 중간→하단 = 아테나2
+            end_ele < 900,                               # 하단 연결 = 제우스3
+        ],
+        [1, 0, 2, 3],
+        default=2,  # 기타는 아테나로
+    ).astype(np.int8)
+
+    for label, name in enumerate(_SLOPE_NAMES):
+        classified[name] = [runs[i] for i in np.where(labels == label)[0]]
+
     return classified
 
-def extract_boundary(runs_for_slope):
+def extract_boundary(track: GPXTrack, runs_for_slope: List[Tuple[int, int]]):
     """슬로프의 모든 런에서 경계 좌표 추출"""
     if not runs_for_slope:
         return [], None, None
-    
-    all_points = []
-    for run in runs_for_slope:
-        all_points.extend(run)
-    
-    if not all_points:
+
+    # 슬로프에 속한 모든 런의 포인트 인덱스 모으기
+    idx = np.concatenate([np.arange(start, end) for start, end in runs_for_slope])
+
+    if len(idx) == 0:
         return [], None, None
-    
+
     # 위도/경도 범위
-    lats = [p['lat'] for p in all_points]
-    lons = [p['lon'] for p in all_points]
-    eles = [p['ele'] for p in all_points]
-    
-    min_lat, max_lat = min(lats), max(lats)
-    min_lon, max_lon = min(lons), max(lons)
-    min_ele, max_ele = min(eles), max(eles)
-    
+    lats = track.lat[idx]
+    lons = track.lon[idx]
+    eles = track.ele[idx]
+
+    # 파이썬 min/max 패스 대신 C 리덕션
+    min_lat, max_lat = lats.min(), lats.max()
+    min_lon, max_lon = lons.min(), lons.max()
+
     # 경계 폴리곤 (사각형 근사)
     boundary = [
         {'lat': max_lat, 'lon': min_lon},  # 상단 좌측
@@ -136,46 +208,51 @@ def extract_boundary(runs_for_slope):
         {'lat': min_lat, 'lon': max_lon},  # 하단 우측
         {'lat': min_lat, 'lon': min_lon},  # 하단 좌측
     ]
-    
-    # 정상/하단 포인트 (가장 높은/낮은 고도)
-    top_point = max(all_points, key=lambda p: p['ele'])
-    bottom_point = min(all_points, key=lambda p: p['ele'])
-    
+
+    # 정상/하단 포인트 (가장 높은/낮은 고도) - 파이썬 콜백 없이 C 리덕션으로
+    top_i = eles.argmax()
+    bottom_i = eles.argmin()
+    top_point = {'lat': lats[top_i], 'lon': lons[top_i], 'ele': eles[top_i]}
+    bottom_point = {'lat': lats[bottom_i], 'lon': lons[bottom_i], 'ele': eles[bottom_i]}
+
     return boundary, top_point, bottom_point
 
 def main():
     file_path = '/Users/gimdoyun/Documents/snow_recorder/2026년 1월 22일 - High 1.gpx'
-    
+
     print("🔍 GPX 파싱 중...")
-    points = parse_gpx(file_path)
-    print(f"   총 포인트: {len(points)}")
-    
+    track = load_points(file_path)
+    print(f"   총 포인트: {len(track)}")
+
     print("\n🏔️ 런 구간 식별 중...")
-    runs = identify_runs(points)
+    runs = identify_runs(track)
     print(f"   감지된 런: {len(runs)}개")
-    
+
     print("\n📊 슬로프 분류 중...")
-    classified = classify_runs_by_elevation(runs)
-    
-    # Swift 코드 생성
-    print("\n" + "="*60)
-    print("📝 SlopeDatabase.swift 업데이트용 좌표")
-    print("="*60)
-    
+    classified = classify_runs_by_elevation(track, runs)
+
+    # Swift 코드 생성 (줄 단위 print 대신 버퍼에 모아 한 번에 출력)
+    out = []
+    out.append("\n" + "="*60)
+    out.append("📝 SlopeDatabase.swift 업데이트용 좌표")
+    out.append("="*60)
+
     for slope_name, slope_runs in classified.items():
         if not slope_runs:
             continue
-            
-        boundary, top, bottom = extract_boundary(slope_runs)
-        
-        print(f"\n// {slope_name}: {len(slope_runs)}런 감지")
-        print(f"// 고도 범위: {bottom['ele']:.0f}m ~ {top['ele']:.0f}m")
-        print(f"boundary: [")
+
+        boundary, top, bottom = extract_boundary(track, slope_runs)
+
+        out.append(f"\n// {slope_name}: {len(slope_runs)}런 감지")
+        out.append(f"// 고도 범위: {bottom['ele']:.0f}m ~ {top['ele']:.0f}m")
+        out.append(f"boundary: [")
         for b in boundary:
-            print(f"    CLLocationCoordinate2D(latitude: {b['lat']:.6f}, longitude: {b['lon']:.6f}),")
-        print("],")
-        print(f"topPoint: CLLocationCoordinate2D(latitude: {top['lat']:.6f}, longitude: {top['lon']:.6f}),")
-        print(f"bottomPoint: CLLocationCoordinate2D(latitude: {bottom['lat']:.6f}, longitude: {bottom['lon']:.6f})")
+            out.append(f"    CLLocationCoordinate2D(latitude: {b['lat']:.6f}, longitude: {b['lon']:.6f}),")
+        out.append("],")
+        out.append(f"topPoint: CLLocationCoordinate2D(latitude: {top['lat']:.6f}, longitude: {top['lon']:.6f}),")
+        out.append(f"bottomPoint: CLLocationCoordinate2D(latitude: {bottom['lat']:.6f}, longitude: {bottom['lon']:.6f})")
+
+    sys.stdout.write('\n'.join(out) + '\n')
 
 if __name__ == '__main__':
     main()
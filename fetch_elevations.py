@@ -4,9 +4,7 @@
 Open-Elevation API를 사용하여 각 슬로프의 시작점/종료점 고도를 조회합니다.
 """
 
-import requests
-import json
-import time
+from snow_tools import fetch_elevations_batch
 
 # SlopeDatabase.swift에서 추출한 슬로프 시작점/종료점 좌표
 SLOPE_POINTS = {
@@ -73,27 +71,6 @@ SLOPE_POINTS = {
 }
 
 
-def fetch_elevation_batch(locations: list) -> list:
-    """Open-Elevation API로 고도 조회 (배치)"""
-    url = "https://api.open-elevation.com/api/v1/lookup"
-    
-    payload = {
-        "locations": [
-            {"latitude": lat, "longitude": lon}
-            for lat, lon in locations
-        ]
-    }
-    
-    try:
-        response = requests.post(url, json=payload, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        return [r["elevation"] for r in data["results"]]
-    except Exception as e:
-        print(f"   ⚠️ API 오류: {e}")
-        return [None] * len(locations)
-
-
 def main():
     print("=" * 70)
     print("🏔️  하이원 리조트 슬로프 고도 조회")
@@ -117,7 +94,7 @@ def main():
     print()
     
     # API 호출 (배치)
-    elevations = fetch_elevation_batch(all_locations)
+    elevations = fetch_elevations_batch(all_locations)
     
     # 결과 매핑
     results = {}
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Overpass 쿼리 공유 캐시 모듈
+compare_osm.py와 fetch_osm_slopes.py가 같은 영역의 슬로프 데이터를 각각
+조회하던 것을, 슈퍼셋 쿼리 한 번으로 받아 디스크에 gzip 캐시하고
+각 스크립트는 메모리에서 필터링하도록 합니다.
+"""
+
+import gzip
+import json
+import os
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+OVERPASS_URL = "https://overpass-api.de/api/interpreter"
+
+# High1 Resort Bounding Box (Min Lat, Min Lon, Max Lat, Max Lon)
+HIGH1_BBOX = "37.17,128.80,37.21,128.85"
+
+_CACHE_DIR = os.path.expanduser("~/.cache/snow_recorder")
+
+
+def _make_session() -> requests.Session:
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+    session.mount("https://", HTTPAdapter(max_retries=retry))
+    session.headers["Accept-Encoding"] = "gzip"
+    return session
+
+
+def get_slopes(bbox: str = HIGH1_BBOX, ttl: int = 86400) -> dict:
+    """bbox 안의 piste:type=downhill 요소 전체 조회 (디스크 캐시, 기본 TTL 1일)"""
+    cache_path = os.path.join(_CACHE_DIR, f"osm_{bbox.replace(',', '_')}.json.gz")
+
+    if os.path.exists(cache_path) and time.time() - os.path.getmtime(cache_path) < ttl:
+        with gzip.open(cache_path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+
+    query = f"""
+[out:json][timeout:180];
+(
+  way["piste:type"="downhill"]({bbox});
+  relation["piste:type"="downhill"]({bbox});
+);
+out body;
+>;
+out skel qt;
+"""
+
+    session = _make_session()
+    response = session.post(OVERPASS_URL, data=query.encode('utf-8'),
+                            headers={'Content-Type': 'application/x-www-form-urlencoded'},
+                            timeout=200)
+    response.raise_for_status()
+    result = response.json()
+
+    os.makedirs(_CACHE_DIR, exist_ok=True)
+    with gzip.open(cache_path, "wt", encoding="utf-8") as f:
+        json.dump(result, f)
+
+    return result
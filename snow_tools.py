@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+스크립트 공용 유틸리티 모듈
+fetch_elevations.py와 update_slope_database.py가 각각 들고 있던
+Open-Elevation 클라이언트(청크 분할/동시 요청/좌표 캐시)와 JSON 헬퍼를
+한 곳으로 모아, 최적화가 한 번만 적용되도록 합니다.
+"""
+
+import asyncio
+import atexit
+import json
+import os
+
+import httpx
+
+try:
+    import orjson  # Rust 기반 파서 - 대형 폴리곤 JSON 직렬화/파싱이 수 배 빠름
+except ImportError:  # 휠이 없는 환경에서는 표준 json으로 동작
+    orjson = None
+
+ELEVATION_URL = "https://api.open-elevation.com/api/v1/lookup"
+_CHUNK_SIZE = 50
+_MAX_CONCURRENCY = 4  # 동시 in-flight 요청 수 상한 (API 부하 방지)
+
+def json_loads(data):
+    """bytes/str JSON 파싱 (orjson 우선, 없으면 stdlib)"""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+def json_dumps_indent(obj) -> bytes:
+    """2칸 들여쓰기 JSON 직렬화 → bytes (orjson 우선, 없으면 stdlib)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, ensure_ascii=True, indent=2).encode()
+
+def _cache_key(lat, lon):
+    return (round(lat, 6), round(lon, 6))
+
+# 좌표별 고도 메모이제이션 - 인접 슬로프가 공유하는 꼭짓점을 중복 조회하지 않음
+# (소수 6자리 ≈ 0.1m로 양자화하여 부동소수점 노이즈에 캐시가 깨지지 않게 함)
+# 같은 좌표는 실행이 달라도 같은 고도이므로 디스크에 유지하여 재실행 시 재조회 생략
+_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           "resources", "elev_cache.json")
+
+def _load_elev_cache():
+    try:
+        with open(_CACHE_PATH, "rb") as f:
+            return {tuple(map(float, key.split(","))): elev
+                    for key, elev in json_loads(f.read()).items()}
+    except (OSError, ValueError):
+        return {}
+
+_elev_cache = _load_elev_cache()
+_loaded_cache_size = len(_elev_cache)
+
+def _save_elev_cache():
+    if len(_elev_cache) == _loaded_cache_size:
+        return  # 새로 조회한 좌표가 없으면 다시 쓰지 않음
+    os.makedirs(os.path.dirname(_CACHE_PATH), exist_ok=True)
+    payload = {f"{lat:.6f},{lon:.6f}": elev for (lat, lon), elev in _elev_cache.items()}
+    with open(_CACHE_PATH, "wb") as f:
+        f.write(json_dumps_indent(payload))
+
+atexit.register(_save_elev_cache)
+
+def make_client() -> httpx.AsyncClient:
+    """HTTP/2 클라이언트 - 청크 POST들을 한 커넥션의 스트림으로 다중화"""
+    return httpx.AsyncClient(http2=True, timeout=30,
+                             limits=httpx.Limits(max_keepalive_connections=16))
+
+async def _fetch_chunk(client, chunk, sem):
+    """청크 하나 조회 (실패 시 None 채움)"""
+    payload = {
+        "locations": [
+            {"latitude": lat, "longitude": lon}
+            for lat, lon in chunk
+        ]
+    }
+    try:
+        async with sem:
+            response = await client.post(ELEVATION_URL, json=payload)
+        response.raise_for_status()
+        data = json_loads(response.content)
+        return [r["elevation"] for r in data["results"]]
+    except Exception as e:
+        print(f"   ⚠️ API 오류: {e}")
+        return [None] * len(chunk)
+
+async def fetch_elevations_batch_async(client, locations):
+    """Open-Elevation API: 캐시 미스만 50개 청크로 동시 조회 (순서 보존)"""
+    keys = [_cache_key(lat, lon) for lat, lon in locations]
+
+    # 캐시에 없는 좌표만 중복 제거하여 조회 대상으로 모음
+    miss = []
+    seen = set()
+    for key, loc in zip(keys, locations):
+        if key not in _elev_cache and key not in seen:
+            seen.add(key)
+            miss.append((key, loc))
+
+    if miss:
+        miss_locs = [loc for _, loc in miss]
+        chunks = [miss_locs[i:i + _CHUNK_SIZE] for i in range(0, len(miss_locs), _CHUNK_SIZE)]
+
+        print(f"   📡 고도 조회 중... ({len(locations)}개 좌표, 캐시 미스 {len(miss)}개, {len(chunks)}청크)")
+        sem = asyncio.Semaphore(_MAX_CONCURRENCY)
+        # gather는 입력 순서대로 결과를 돌려주므로 평탄화만으로 순서 보존
+        parts = await asyncio.gather(*[_fetch_chunk(client, c, sem) for c in chunks])
+        fetched = [elev for part in parts for elev in part]
+
+        for (key, _), elev in zip(miss, fetched):
+            if elev is not None:  # 실패(None)는 캐시하지 않아 재시도 가능
+                _elev_cache[key] = elev
+
+    return [_elev_cache.get(key) for key in keys]
+
+def fetch_elevations_batch(locations):
+    """동기 진입점 - 전부 캐시 적중이면 클라이언트 없이 바로 반환"""
+    keys = [_cache_key(lat, lon) for lat, lon in locations]
+    if all(key in _elev_cache for key in keys):
+        return [_elev_cache[key] for key in keys]
+
+    async def _run():
+        async with make_client() as client:
+            return await fetch_elevations_batch_async(client, locations)
+    return asyncio.run(_run())
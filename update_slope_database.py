@@ -6,100 +6,105 @@ SlopeDatabase.swift 파일을 파싱하여 모든 슬로프의 좌표를 추출
 """
 
 import argparse
-import json
 import re
-import time
+import sys
 
-import requests
+from snow_tools import fetch_elevations_batch, json_dumps_indent, json_loads
 
 SWIFT_FILE_PATH = "snow_recorder/Models/SlopeDatabase.swift"
 OUTPUT_FILE_PATH = "snow_recorder/Models/SlopeDatabase_Updated.swift"
 DEFAULT_JSON_INPUT = "resources/yongpyong_slopes.json"
 DEFAULT_JSON_OUTPUT = "resources/yongpyong_slopes_with_elevation.json"
 
-def fetch_elevations_batch(locations):
-    """Open-Elevation API: 50개씩 배치 처리"""
-    url = "https://api.open-elevation.com/api/v1/lookup"
-    results = []
-    
-    # 50개 단위로 청크 분할
-    chunk_size = 50
-    for i in range(0, len(locations), chunk_size):
-        chunk = locations[i:i + chunk_size]
-        payload = {
-            "locations": [
-                {"latitude": lat, "longitude": lon}
-                for lat, lon in chunk
-            ]
-        }
-        try:
-            print(f"   📡 고도 조회 중... ({i+1}~{min(i+chunk_size, len(locations))}/{len(locations)})")
-            response = requests.post(url, json=payload, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-            results.extend([r["elevation"] for r in data["results"]])
-            time.sleep(0.5) # API 부하 방지
-        except Exception as e:
-            print(f"   ⚠️ API 오류: {e}")
-            results.extend([None] * len(chunk))
-            
-    return results
+# 진행 로그는 줄마다 print(= write + flush syscall)하지 않고 모아서 주기 출력
+_progress_buf = []
+_FLUSH_EVERY = 10
+
+def _log(line=""):
+    _progress_buf.append(line)
+    if len(_progress_buf) >= _FLUSH_EVERY:
+        _flush_log()
+
+def _flush_log():
+    if _progress_buf:
+        sys.stdout.write("\n".join(_progress_buf) + "\n")
+        sys.stdout.flush()
+        _progress_buf.clear()
 
 def update_json_slopes_with_elevation(input_path, output_path):
     """JSON 슬로프 데이터에 top/bottom 고도 정보 추가"""
-    with open(input_path, "r") as f:
-        slopes = json.load(f)
+    with open(input_path, "rb") as f:
+        slopes = json_loads(f.read())
 
     for slope in slopes:
         name = slope.get("name", "Unknown")
         polygon = slope.get("polygon", [])
         if not polygon:
-            print(f"   ⚠️ [{name}] polygon 없음. 건너뜀.")
+            _log(f"   ⚠️ [{name}] polygon 없음. 건너뜀.")
             continue
 
         locations = [(lat, lon) for lat, lon in polygon]
         elevations = fetch_elevations_batch(locations)
 
         if None in elevations:
-            print(f"   ⚠️ [{name}] 고도 조회 실패. 건너뜀.")
+            _log(f"   ⚠️ [{name}] 고도 조회 실패. 건너뜀.")
             continue
 
-        points = []
-        for (lat, lon), alt in zip(locations, elevations):
-            points.append({"lat": lat, "lon": lon, "alt": alt})
-
-        sorted_points = sorted(points, key=lambda x: x["alt"], reverse=True)
-        top = sorted_points[0]
-        bottom = sorted_points[-1]
-
-        slope["topPoint"] = {"lat": top["lat"], "lon": top["lon"]}
-        slope["bottomPoint"] = {"lat": bottom["lat"], "lon": bottom["lon"]}
-        slope["topAltitude"] = round(top["alt"], 1)
-        slope["bottomAltitude"] = round(bottom["alt"], 1)
-
-        print(f"   ✅ [{name}] Top: {top['alt']}m, Bottom: {bottom['alt']}m")
-
-    with open(output_path, "w") as f:
-        json.dump(slopes, f, ensure_ascii=True, indent=2)
-
-    print(f"✨ JSON 업데이트 완료: {output_path}")
+        # 정렬 대신 O(n) 최댓값/최솟값 인덱스 한 번씩만 찾음
+        top_idx = max(range(len(elevations)), key=elevations.__getitem__)
+        bot_idx = min(range(len(elevations)), key=elevations.__getitem__)
+        top_lat, top_lon = locations[top_idx]
+        bot_lat, bot_lon = locations[bot_idx]
+
+        slope["topPoint"] = {"lat": top_lat, "lon": top_lon}
+        slope["bottomPoint"] = {"lat": bot_lat, "lon": bot_lon}
+        slope["topAltitude"] = round(elevations[top_idx], 1)
+        slope["bottomAltitude"] = round(elevations[bot_idx], 1)
+
+        _log(f"   ✅ [{name}] Top: {elevations[top_idx]}m, Bottom: {elevations[bot_idx]}m")
+
+    with open(output_path, "wb") as f:
+        f.write(json_dumps_indent(slopes))
+
+    _log(f"✨ JSON 업데이트 완료: {output_path}")
+    _flush_log()
+
+# parse_slopes용 정규식 - 모듈 로드 시 1회 컴파일
+# 필드 7종을 named group 하나의 교대(alternation)로 묶어 블록을 한 번만 스캔
+_FIELD_RE = re.compile(
+    r'name:\s*"(?P<name>[^"]+)"'
+    r'|koreanName:\s*"(?P<koreanName>[^"]+)"'
+    r'|difficulty:\s*(?P<difficulty>\.[a-zA-Z]+)'
+    r'|length:\s*(?P<length>[\d\.]+)'
+    r'|avgGradient:\s*(?P<avgGradient>[\d\.]+)'
+    r'|maxGradient:\s*(?P<maxGradient>[\d\.]+)'
+    r'|status:\s*(?P<status>\.[a-zA-Z]+)'
+)
+_COORD_RE = re.compile(r'latitude:\s*([\d\.]+),\s*longitude:\s*([\d\.]+)')
+
+# Slope( 리터럴 블록 하나 (닫는 `),`까지) - split 복사 없이 원본을 한 번만 스캔
+_BLOCK_RE = re.compile(r'Slope\((.*?)\n\s*\),', re.DOTALL)
+
+# 필드별 기본값 (블록에서 찾지 못한 경우)
+_FIELD_DEFAULTS = {
+    "name": "Unknown",
+    "koreanName": "",
+    "difficulty": ".beginner",
+    "length": "0",
+    "avgGradient": "0",
+    "maxGradient": "0",
+    "status": ".closed",
+}
 
 def parse_slopes(content):
-    # Regex 대신, 'Slope(' 문자를 기준으로 split하여 처리
-    # 이렇게 하면 괄호 중첩 문제를 피할 수 있음.
-    raw_blocks = content.split("Slope(")
+    # split("Slope(") 대신 블록 정규식으로 원본 전체를 한 번만 스캔
+    # (블록별 부분 문자열 복사 제거 + findSlope( 같은 식별자 오탐 차단)
     slopes = []
-    
-    # 첫 번째 조각은 import 문 등이므로 제외
-    for block in raw_blocks[1:]:
-        # block은 "name: ..., ... )" 형태일 것임.
-        # 편의상 block 전체에서 검색
-        slope_block = block
-        
-        # 이름 추출
-        name_match = re.search(r'name:\s*"([^"]+)"', slope_block)
-        name = name_match.group(1) if name_match else "Unknown"
-        
+
+    for block_match in _BLOCK_RE.finditer(content):
+        # group(1)은 "name: ..., ... " 형태의 초기화 블록 본문
+        slope_block = block_match.group(1)
+
         # Boundary 추출
         # boundary: [...] 패턴을 찾음.
         # 대괄호 안의 내용이 상당히 길 수 있으므로 DOTALL 필수
@@ -133,58 +138,39 @@ def parse_slopes(content):
                     boundary_text = slope_block[sq_open:sq_close]
                     
                     # 좌표 추출
-                    coord_pattern = re.compile(r'latitude:\s*([\d\.]+),\s*longitude:\s*([\d\.]+)')
-                    for cm in coord_pattern.finditer(boundary_text):
+                    for cm in _COORD_RE.finditer(boundary_text):
                         lat = float(cm.group(1))
                         lon = float(cm.group(2))
                         boundary_coords.append((lat, lon))
-        
-        # 기타 필드 보존을 위해 원본 블록 저장 (필요시)
-        # 여기서는 새로 생성할 것이므로 파싱만 함
-        
-        # 기존 필드값 파싱 (Optional하게 처리)
-        korean_name_m = re.search(r'koreanName:\s*"([^"]+)"', slope_block)
-        korean_name = korean_name_m.group(1) if korean_name_m else ""
-        
-        difficulty_m = re.search(r'difficulty:\s*(\.[a-zA-Z]+)', slope_block)
-        difficulty = difficulty_m.group(1) if difficulty_m else ".beginner"
-        
-        length_m = re.search(r'length:\s*([\d\.]+)', slope_block)
-        length = length_m.group(1) if length_m else "0"
-        
-        avg_grad_m = re.search(r'avgGradient:\s*([\d\.]+)', slope_block)
-        avg_grad = avg_grad_m.group(1) if avg_grad_m else "0"
-        
-        max_grad_m = re.search(r'maxGradient:\s*([\d\.]+)', slope_block)
-        max_grad = max_grad_m.group(1) if max_grad_m else "0"
-        
-        status_m = re.search(r'status:\s*(\.[a-zA-Z]+)', slope_block)
-        status = status_m.group(1) if status_m else ".closed"
-        
-        slopes.append({
-            "name": name,
-            "koreanName": korean_name,
-            "difficulty": difficulty,
-            "length": length,
-            "avgGradient": avg_grad,
-            "maxGradient": max_grad,
-            "status": status,
-            "boundary": boundary_coords
-        })
-        
+
+        # 필드 7종을 한 번의 스캔으로 파싱 (필드별 첫 매칭 = 기존 re.search와 동일)
+        fields = dict(_FIELD_DEFAULTS)
+        seen = set()
+        for m in _FIELD_RE.finditer(slope_block):
+            key = m.lastgroup
+            if key not in seen:
+                seen.add(key)
+                fields[key] = m.group(key)
+
+        fields["boundary"] = boundary_coords
+        slopes.append(fields)
+
     return slopes
 
 def generate_slope_code(slope_data):
     """Slope 구조체 Swift 코드로 변환"""
     
-    boundary_str = ""
     if not slope_data["boundary"]:
         boundary_str = "            boundary: [],"
     else:
-        boundary_str = "            boundary: [\n"
-        for lat, lon in slope_data["boundary"]:
-            boundary_str += f"                CLLocationCoordinate2D(latitude: {lat}, longitude: {lon}),\n"
-        boundary_str += "            ],"
+        # 꼭짓점마다 += 하면 O(V²) 복사 - 리스트에 모아 join 한 번으로
+        parts = ["            boundary: [\n"]
+        parts.extend(
+            f"                CLLocationCoordinate2D(latitude: {lat}, longitude: {lon}),\n"
+            for lat, lon in slope_data["boundary"]
+        )
+        parts.append("            ],")
+        boundary_str = "".join(parts)
 
     # Top/Bottom Point & Altitude
     top_p = slope_data.get("topPoint")
@@ -226,57 +212,67 @@ def main():
     args = parser.parse_args()
 
     if args.mode == "json":
-        print("📂 JSON 슬로프 파일 읽는 중...")
+        _log("📂 JSON 슬로프 파일 읽는 중...")
         update_json_slopes_with_elevation(args.json_input, args.json_output)
         return
 
-    print("📂 SlopeDatabase.swift 읽는 중...")
+    _log("📂 SlopeDatabase.swift 읽는 중...")
     with open(SWIFT_FILE_PATH, "r") as f:
         content = f.read()
 
     slopes = parse_slopes(content)
-    print(f"🧩 {len(slopes)}개의 슬로프 파싱 완료.")
+    _log(f"🧩 {len(slopes)}개의 슬로프 파싱 완료.")
 
-    updated_slopes_code = []
+    # 모든 슬로프의 boundary를 하나의 리스트로 모아 한 번에 조회
+    # (슬로프별 HTTP 왕복 N회 → 전체 좌표 기준 청크 수만큼으로 축소)
+    all_locs = []
+    offsets = {}
+    for i, slope in enumerate(slopes):
+        if slope["boundary"]:
+            offsets[i] = (len(all_locs), len(all_locs) + len(slope["boundary"]))
+            all_locs.extend(slope["boundary"])
 
-    for slope in slopes:
-        print(f"\n🏔️  [{slope['name']}] 처리 중...")
+    all_elevations = fetch_elevations_batch(all_locs)
 
-        if not slope["boundary"]:
-            print("   ⚠️ Boundary 데이터 없음. 건너뜀.")
-            updated_slopes_code.append(generate_slope_code(slope))
-            continue
+    # 슬로프별 코드를 리스트에 모았다가 join하는 대신 파일 핸들에 바로 스트리밍
+    # (리스트 + 거대 문자열을 동시에 들고 있지 않음)
+    _log("\n💾 새로운 Swift 코드 생성 중...")
 
-        # 고도 조회
-        elevations = fetch_elevations_batch(slope["boundary"])
+    with open("new_slopes_array.swift", "w", buffering=1 << 20) as f:
+        for i, slope in enumerate(slopes):
+            _log(f"\n🏔️  [{slope['name']}] 처리 중...")
 
-        if None in elevations:
-            print("   ⚠️ 고도 데이터 조회 실패. 기존 데이터 유지 시도.")
-            updated_slopes_code.append(generate_slope_code(slope))
-            continue
+            if i:
+                f.write("\n")
 
-        # 데이터 결합 및 정렬
-        points = []
-        for (lat, lon), alt in zip(slope["boundary"], elevations):
-            points.append({"lat": lat, "lon": lon, "alt": alt})
+            if not slope["boundary"]:
+                _log("   ⚠️ Boundary 데이터 없음. 건너뜀.")
+                f.write(generate_slope_code(slope))
+                continue
 
-        # 고도순 정렬 (내림차순)
-        sorted_points = sorted(points, key=lambda x: x["alt"], reverse=True)
+            lo, hi = offsets[i]
+            elevations = all_elevations[lo:hi]
 
-        slope["topPoint"] = sorted_points[0]
-        slope["bottomPoint"] = sorted_points[-1]
+            if None in elevations:
+                _log("   ⚠️ 고도 데이터 조회 실패. 기존 데이터 유지 시도.")
+                f.write(generate_slope_code(slope))
+                continue
 
-        print(f"   ✅ Top: {slope['topPoint']['alt']}m, Bottom: {slope['bottomPoint']['alt']}m")
+            # 정렬 없이 최고/최저 고도 인덱스만 O(n)으로 찾음
+            top_idx = max(range(len(elevations)), key=elevations.__getitem__)
+            bot_idx = min(range(len(elevations)), key=elevations.__getitem__)
+            top_lat, top_lon = slope["boundary"][top_idx]
+            bot_lat, bot_lon = slope["boundary"][bot_idx]
 
-        updated_slopes_code.append(generate_slope_code(slope))
+            slope["topPoint"] = {"lat": top_lat, "lon": top_lon, "alt": elevations[top_idx]}
+            slope["bottomPoint"] = {"lat": bot_lat, "lon": bot_lon, "alt": elevations[bot_idx]}
 
-    # 최종 파일 생성
-    print("\n💾 새로운 Swift 코드 생성 중...")
+            _log(f"   ✅ Top: {slope['topPoint']['alt']}m, Bottom: {slope['bottomPoint']['alt']}m")
 
-    with open("new_slopes_array.swift", "w") as f:
-        f.write("\n".join(updated_slopes_code))
+            f.write(generate_slope_code(slope))
 
-    print("✨ new_slopes_array.swift 생성 완료!")
+    _log("✨ new_slopes_array.swift 생성 완료!")
+    _flush_log()
 
 if __name__ == "__main__":
     main()
@@ -5,10 +5,14 @@ Swift의 Ray Caasting 로직을 Python으로 포팅하여,
 SlopeDatabase.swift에 정의된 폴리곤이 실제 GPX 경로를 올바르게 감지하는지 검증합니다.
 """
 
-import xml.etree.ElementTree as ET
 import sys
 from collections import defaultdict
 
+import numpy as np
+from lxml import etree
+from numba import njit
+from rtree import index
+
 # =============================================================================
 # 1. SlopeDatabase.swift에서 정의된 폴리곤 좌표 (직접 포팅)
 # =============================================================================
@@ -44,97 +48,153 @@ SLOPE_DEFINITIONS = {
 # 2. 로직 구현 (Swift 포팅)
 # =============================================================================
 
-def contains_coordinate(polygon: list, lat: float, lon: float) -> bool:
-    """Ray Casting 알고리즘 (Swift의 contains 메서드와 동일)"""
-    if len(polygon) < 3:
+# 스칼라 경로용 (V, 2) float64 폴리곤 배열 (njit 커널이 받는 형태)
+_SLOPE_NAMES = list(SLOPE_DEFINITIONS.keys())
+_POLY_MATS = [np.array(poly, dtype=np.float64) for poly in SLOPE_DEFINITIONS.values()]
+
+# 폴리곤별 AABB (min_lat, max_lat, min_lon, max_lon) - 비교 4번으로 대부분의
+# (포인트, 폴리곤) 쌍을 레이캐스팅 전에 기각
+_BBOXES = [(m[:, 0].min(), m[:, 0].max(), m[:, 1].min(), m[:, 1].max())
+           for m in _POLY_MATS]
+
+# bbox R-tree - 슬로프 수가 전체 SlopeDatabase 규모로 늘어도 후보 조회가 O(log S)
+_BBOX_INDEX = index.Index()
+for _pid, (_lat_lo, _lat_hi, _lon_lo, _lon_hi) in enumerate(_BBOXES):
+    _BBOX_INDEX.insert(_pid, (_lon_lo, _lat_lo, _lon_hi, _lat_hi))
+
+@njit(cache=True, fastmath=True)
+def contains_coordinate(polygon: np.ndarray, lat: float, lon: float) -> bool:
+    """Ray Casting 알고리즘 (Swift의 contains 메서드와 동일, Numba 네이티브 컴파일)
+
+    Swift: let xi = boundary[i].latitude, let yi = boundary[i].longitude
+    if ((yi > coordinate.longitude) != (yj > coordinate.longitude)) &&
+       (coordinate.latitude < (xj - xi) * (coordinate.longitude - yi) / (yj - yi) + xi)
+    """
+    n = polygon.shape[0]
+    if n < 3:
         return False
-    
+
     is_inside = False
-    n = len(polygon)
-    j = n - 1
-    
+
+    # 직전 꼭짓점은 로컬에 들고 다녀 변마다 배열 인덱싱을 절반으로 줄임
+    xj = polygon[n - 1, 0]
+    yj = polygon[n - 1, 1]
+
     for i in range(n):
-        xi = polygon[i][0] # Latitude
-        yi = polygon[i][1] # Longitude
-        xj = polygon[j][0]
-        yj = polygon[j][1]
-        
-        # 주의: Swift 코드에서는 (yi > coordinate.longitude) != (yj > coordinate.longitude)
-        # 여기서 yi는 Longitude여야 하는데, Swift 코드의 변수명이 좀 헷갈리게 되어 있음.
-        # Swift: let xi = boundary[i].latitude, let yi = boundary[i].longitude
-        # Swift Logic:
-        # if ((yi > coordinate.longitude) != (yj > coordinate.longitude)) &&
-        #    (coordinate.latitude < (xj - xi) * (coordinate.longitude - yi) / (yj - yi) + xi)
-        
-        # Python으로 정확히 옮김:
-        xi = polygon[i][0] # Lat
-        yi = polygon[i][1] # Lon
-        xj = polygon[j][0] # Lat
-        yj = polygon[j][1] # Lon
-        
+        xi = polygon[i, 0]  # Lat
+        yi = polygon[i, 1]  # Lon
+
         if ((yi > lon) != (yj > lon)) and \
            (lat < (xj - xi) * (lon - yi) / (yj - yi) + xi):
             is_inside = not is_inside
-            
-        j = i
-        
+
+        xj = xi
+        yj = yi
+
     return is_inside
 
 def find_slope(lat: float, lon: float) -> str:
     """주어진 좌표가 포함된 슬로프 이름 반환 (첫 번째 매칭)"""
     # 우선순위: 상세한 구역부터 체크 (겹칠 경우 대비)
     # 여기서는 단순 순회
-    for name, polygon in SLOPE_DEFINITIONS.items():
-        if contains_coordinate(polygon, lat, lon):
-            return name
+    # R-tree로 bbox 후보만 조회, 정의 순서 우선을 지키도록 pid 정렬 후 레이캐스팅
+    for pid in sorted(_BBOX_INDEX.intersection((lon, lat, lon, lat))):
+        if contains_coordinate(_POLY_MATS[pid], lat, lon):
+            return _SLOPE_NAMES[pid]
     return None
 
+# 벡터 레이캐스팅용: 폴리곤별 꼭짓점 배열과 한 칸 민 배열(xj, yj)을 선계산
+_POLY_ARRAYS = []
+for _poly in SLOPE_DEFINITIONS.values():
+    _xs = np.array([v[0] for v in _poly])  # Lat
+    _ys = np.array([v[1] for v in _poly])  # Lon
+    _POLY_ARRAYS.append((_xs, _ys, np.roll(_xs, 1), np.roll(_ys, 1)))
+
+def find_slopes_array(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """전체 포인트 배열에 대한 슬로프 라벨 계산 (-1 = 미포함)
+
+    contains_coordinate의 edge-crossing 판정을 (포인트 × 변) 브로드캐스트로
+    한 번에 수행하고, 변마다의 교차를 XOR로 접어 포함 마스크를 얻습니다.
+    라벨은 find_slope와 같은 정의 순서 우선(첫 매칭)입니다.
+    """
+    masks = []
+    for (xs, ys, xj, yj), (lat_lo, lat_hi, lon_lo, lon_hi) in zip(_POLY_ARRAYS, _BBOXES):
+        # AABB 선검사로 후보 포인트만 추려 레이캐스팅 (박스 밖은 전부 False)
+        cand = (lats >= lat_lo) & (lats <= lat_hi) & (lons >= lon_lo) & (lons <= lon_hi)
+        mask = np.zeros(len(lats), dtype=bool)
+        if cand.any():
+            lat_col = lats[cand][:, None]
+            lon_col = lons[cand][:, None]
+            cond1 = (ys[None, :] > lon_col) != (yj[None, :] > lon_col)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                cond2 = lat_col < (xj - xs) * (lon_col - ys) / (yj - ys) + xs
+            mask[cand] = np.logical_xor.reduce(cond1 & cond2, axis=1)
+        masks.append(mask)
+
+    stacked = np.stack(masks)                      # (S, P)
+    labels = stacked.argmax(axis=0).astype(np.int64)  # 첫 True의 인덱스
+    labels[~stacked.any(axis=0)] = -1
+    return labels
+
 # =============================================================================
 # 3. GPX 파싱 및 검증
 # =============================================================================
 
+# GPX 네임스페이스 (lxml은 qualified name으로 C 레벨에서 바로 탐색)
+_GPX_NS = 'http://www.topografix.com/GPX/1/1'
+_GTE_NS = 'http://www.gpstrackeditor.com/xmlschemas/General/1'
+_TRKPT_TAG = f'{{{_GPX_NS}}}trkpt'
+_ELE_TAG = f'{{{_GPX_NS}}}ele'
+_EXT_TAG = f'{{{_GPX_NS}}}extensions'
+_GPS_TAG = f'{{{_GTE_NS}}}gps'
+
 def parse_gpx_points(file_path: str):
-    tree = ET.parse(file_path)
-    root = tree.getroot()
-    ns = {'gpx': 'http://www.topografix.com/GPX/1/1', 'gte': 'http://www.gpstrackeditor.com/xmlschemas/General/1'}
-    
-    points = []
-    for trkpt in root.findall('.//gpx:trkpt', ns):
-        lat = float(trkpt.get('lat'))
-        lon = float(trkpt.get('lon'))
-        ele_elem = trkpt.find('gpx:ele', ns)
-        ele = float(ele_elem.text) if ele_elem is not None else 0
-        
+    """GPX를 SoA(Struct-of-Arrays) 형태로 파싱 - 포인트별 dict 할당 제거"""
+    lats, lons, eles, speeds = [], [], [], []
+
+    # iterparse 스트리밍: DOM 전체를 만들지 않고 trkpt 단위로 처리 후 바로 해제
+    for _, trkpt in etree.iterparse(file_path, events=('end',), tag=_TRKPT_TAG):
+        lats.append(float(trkpt.get('lat')))
+        lons.append(float(trkpt.get('lon')))
+        ele_elem = trkpt.find(_ELE_TAG)
+        eles.append(float(ele_elem.text) if ele_elem is not None else 0)
+
         # 속도 (m/s)
         speed = 0.0
-        extensions = trkpt.find('gpx:extensions', ns)
+        extensions = trkpt.find(_EXT_TAG)
         if extensions is not None:
-            gps = extensions.find('gte:gps', ns)
+            gps = extensions.find(_GPS_TAG)
             if gps is not None:
                 speed = float(gps.get('speed', 0))
-                
-        points.append({'lat': lat, 'lon': lon, 'ele': ele, 'speed_kmh': speed * 3.6})
-    return points
-
-def identify_runs(points):
-    """간단한 런 식별 (속도 > 10km/h)"""
-    runs = []
-    current_run = []
-    in_run = False
-    
-    for p in points:
-        if p['speed_kmh'] > 10:
-            if not in_run:
-                in_run = True
-                current_run = [p]
-            else:
-                current_run.append(p)
-        else:
-            if in_run and len(current_run) > 20: 
-                runs.append(current_run)
-            in_run = False
-            current_run = []
-    return runs
+        speeds.append(speed)
+
+        # 처리한 trkpt와 앞선 형제 노드는 바로 해제 (피크 메모리 절감)
+        trkpt.clear()
+        while trkpt.getprevious() is not None:
+            del trkpt.getparent()[0]
+
+    return {
+        'lat': np.asarray(lats),
+        'lon': np.asarray(lons),
+        'ele': np.asarray(eles),
+        'speed_kmh': np.asarray(speeds) * 3.6,
+    }
+
+def identify_runs(speed_kmh: np.ndarray):
+    """간단한 런 식별 (속도 > 10km/h) - (start, end) 슬라이스 경계 반환"""
+    riding = (speed_kmh > 10).astype(np.int8)
+    edges = np.diff(riding)
+    starts = np.where(edges == 1)[0] + 1
+    ends = np.where(edges == -1)[0] + 1
+    if riding.size and riding[0]:
+        starts = np.concatenate(([0], starts))
+
+    # 파일 끝까지 이어지는 런은 종료 지점이 없으므로 제외 (기존 루프와 동일)
+    n = min(len(starts), len(ends))
+    starts, ends = starts[:n], ends[:n]
+
+    keep = (ends - starts) > 20  # 최소 20포인트
+    return list(zip(starts[keep].tolist(), ends[keep].tolist()))
 
 def main():
     if len(sys.argv) > 1:
@@ -143,8 +203,8 @@ def main():
         file_path = '/Users/gimdoyun/Documents/snow_recorder/2026년 1월 22일 - High 1.gpx'
         
     print(f"🔍 GPX 파일 분석 중: {file_path}")
-    points = parse_gpx_points(file_path)
-    runs = identify_runs(points)
+    track = parse_gpx_points(file_path)
+    runs = identify_runs(track['speed_kmh'])
     
     print(f"   총 {len(runs)}개의 런 감지됨")
     print("\n[검증 결과]")
@@ -153,26 +213,23 @@ def main():
     
     slope_counts = defaultdict(int)
     
-    for i, run in enumerate(runs, 1):
-        detected_slopes = set()
-        slope_votes = defaultdict(int)
-        
-        for p in run:
-            slope = find_slope(p['lat'], p['lon'])
-            if slope:
-                detected_slopes.add(slope)
-                slope_votes[slope] += 1
-        
+    for i, (start, end) in enumerate(runs, 1):
+        # 런 전체를 한 번의 벡터 레이캐스팅으로 판정 (복사 없는 슬라이스 뷰)
+        run_len = end - start
+        labels = find_slopes_array(track['lat'][start:end], track['lon'][start:end])
+        hits = labels[labels >= 0]
+
         # 가장 많이 감지된 슬로프 선정
-        if slope_votes:
-            primary_slope = max(slope_votes, key=slope_votes.get)
-            percentage = (slope_votes[primary_slope] / len(run)) * 100
+        if hits.size:
+            label_ids, votes = np.unique(hits, return_counts=True)
+            primary_slope = _SLOPE_NAMES[label_ids[votes.argmax()]]
+            percentage = (votes.max() / run_len) * 100
             result_str = f"{primary_slope} ({percentage:.1f}%)"
             slope_counts[primary_slope] += 1
         else:
             result_str = "Unknown"
-            
-        print(f"Run {i:<6} | {len(run):<8} | {result_str}")
+
+        print(f"Run {i:<6} | {run_len:<8} | {result_str}")
         
     print("\n📊 종합 요약")
     for slope, count in sorted(slope_counts.items()):